@@ -0,0 +1,58 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+from .. import db
+from ..responses import dumps
+
+router = APIRouter()
+
+BATCH_SIZE = 500
+
+# Every run, one table at a time, with team and engine names joined in. Read
+# in keyset batches on result_id so a pooled connection is only held for one
+# batch at a time, never for a whole (possibly slow) download.
+EXPORT_QUERIES = [
+    ("hybrids", """
+        SELECT t.team_name, e.engine_type, r.*
+        FROM hybrids_results r
+        LEFT JOIN teams t ON t.team_id = r.team_id
+        LEFT JOIN engines e ON e.engine_id = r.engine_id
+        WHERE r.result_id > :after_id
+        ORDER BY r.result_id
+        LIMIT :limit
+    """),
+    ("biprops", """
+        SELECT t.team_name, e.engine_type, r.*
+        FROM biprops_results r
+        LEFT JOIN teams t ON t.team_id = r.team_id
+        LEFT JOIN engines e ON e.engine_id = r.engine_id
+        WHERE r.result_id > :after_id
+        ORDER BY r.result_id
+        LIMIT :limit
+    """),
+]
+
+
+def _fetch_batch(sql: str, after_id: int):
+    with db.connection() as conn:
+        cursor = conn.execute(sql, {"after_id": after_id, "limit": BATCH_SIZE})
+        columns = [col[0] for col in cursor.description]
+        return columns, cursor.fetchall()
+
+
+def iter_runs_ndjson():
+    # Sync generator: Starlette pulls each chunk in a worker thread, and only
+    # one batch is held in memory at a time
+    for category, sql in EXPORT_QUERIES:
+        after_id = 0
+        while True:
+            columns, rows = _fetch_batch(sql, after_id)
+            if not rows:
+                break
+            records = [dict(zip(columns, row)) for row in rows]
+            after_id = records[-1]["result_id"]
+            yield b"".join(dumps({"category": category, **record}) + b"\n" for record in records)
+
+
+@router.get("/runs.ndjson")
+def export_runs():
+    return StreamingResponse(iter_runs_ndjson(), media_type="application/x-ndjson")
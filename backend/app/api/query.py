@@ -1,32 +1,212 @@
-from fastapi import APIRouter
-import sqlite3
+import base64
+import json
+import math
+from typing import Optional
+from fastapi import APIRouter, Request
+from .. import db, config
+from ..cache import LRUCache
+from ..conditional import conditional_json
+from ..executors import run_db
+from ..responses import FastJSONResponse
 
 router = APIRouter()
 
-@router.post("/")
-async def query_db(item: dict):
-    q = item.get("query", "")
-    conn = sqlite3.connect("race-to-space.db")
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT t.team_name, e.engine_type,
-               hr.total_score AS hybrids_score,
-               br.total_score AS biprops_score
-        FROM teams t
-        LEFT JOIN hybrids_results hr ON t.team_id = hr.team_id
-        LEFT JOIN biprops_results br ON t.team_id = br.team_id
-        LEFT JOIN engines e ON e.engine_id = hr.engine_id
-        WHERE t.team_name LIKE ?
-    """, (f"%{q}%",))
-    rows = cursor.fetchall()
-    conn.close()
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+MIN_TRIGRAM_QUERY = 3
+
+# Keyset start values: below any FTS rank / team_id
+FIRST_RANK = float("-inf")
+FIRST_TEAM_ID = -(2 ** 63)
+LAST_TEAM_ID = 2 ** 63 - 1  # SQLite INTEGER range
+
+# -----------------------
+# Search SQL
+# -----------------------
+# The matching page of teams is picked first (keyset + LIMIT), then each
+# results table is aggregated only for those teams. A team with m hybrid and
+# n biprop runs is one row rather than m x n duplicates, and every page
+# costs the same however deep it is.
+
+# Substring search through the FTS5 trigram index, best matches first
+FTS_PAGE_SQL = """
+    WITH page AS (
+        SELECT t.team_id, t.team_name, s.rank
+        FROM (SELECT rowid AS team_id, rank FROM team_search WHERE team_search MATCH :match) AS s
+        JOIN teams t ON t.team_id = s.team_id
+        WHERE (s.rank, t.team_id) > (:after_rank, :after_id)
+        ORDER BY s.rank, t.team_id
+        LIMIT :limit
+    )
+"""
+
+# Fallback for unmigrated databases and queries shorter than one trigram
+LIKE_PAGE_SQL = """
+    WITH page AS (
+        SELECT team_id, team_name, 0 AS rank
+        FROM teams
+        WHERE team_name LIKE :pattern AND team_id > :after_id
+        ORDER BY team_id
+        LIMIT :limit
+    )
+"""
+
+RESULTS_SQL = """
+    SELECT p.team_id, p.rank, p.team_name, e.engine_type,
+           hr.total_score AS hybrids_score,
+           br.total_score AS biprops_score,
+           hr.runs AS hybrids_runs, hr.best_score AS hybrids_best,
+           br.runs AS biprops_runs, br.best_score AS biprops_best
+    FROM page p
+    LEFT JOIN (
+        SELECT team_id, COUNT(*) AS runs, SUM(total_score) AS total_score,
+               MAX(total_score) AS best_score, MIN(engine_id) AS engine_id
+        FROM hybrids_results WHERE team_id IN (SELECT team_id FROM page)
+        GROUP BY team_id
+    ) hr ON p.team_id = hr.team_id
+    LEFT JOIN (
+        SELECT team_id, COUNT(*) AS runs, SUM(total_score) AS total_score,
+               MAX(total_score) AS best_score
+        FROM biprops_results WHERE team_id IN (SELECT team_id FROM page)
+        GROUP BY team_id
+    ) br ON p.team_id = br.team_id
+    LEFT JOIN engines e ON e.engine_id = hr.engine_id
+    ORDER BY p.rank, p.team_id
+"""
+
+FTS_SEARCH_SQL = FTS_PAGE_SQL + RESULTS_SQL
+SEARCH_SQL = LIKE_PAGE_SQL + RESULTS_SQL
+
+
+def _has_team_search(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'team_search'"
+    ).fetchone()
+    return row is not None
+
+
+def _fts_phrase(q: str):
+    # Quote as a single FTS5 phrase so the text is matched literally
+    return '"' + q.replace('"', '""') + '"'
+
+
+# -----------------------
+# Cursors
+# -----------------------
+# Opaque to clients: base64 of [mode, last rank, last team_id]
+def _encode_cursor(mode: str, rank, team_id: int):
+    raw = json.dumps([mode, rank, team_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, mode: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_mode, rank, team_id = json.loads(base64.urlsafe_b64decode(padded))
+        rank, team_id = float(rank), int(team_id)
+        if cursor_mode != mode or not math.isfinite(rank) or not FIRST_TEAM_ID <= team_id <= LAST_TEAM_ID:
+            raise ValueError
+        return rank, team_id
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError("Invalid 'cursor'")
+
+
+def _parse_limit(limit):
+    if limit is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(limit)
+    except (ValueError, TypeError, OverflowError):
+        raise ValueError("Invalid 'limit'")
+    if limit < 1:
+        raise ValueError("Invalid 'limit'")
+    return min(limit, MAX_LIMIT)
+
+
+# Searches repeat a lot (the same team names), so results are cached per
+# data version and a repeated search never reaches SQLite
+search_cache = LRUCache(config.QUERY_CACHE_ENTRIES, config.QUERY_CACHE_BYTES)
+
+
+def _normalize(q: str):
+    # LIKE and the trigram index both ignore ASCII case
+    term = q.strip()
+    return term.lower() if term.isascii() else term
+
+
+def search_teams(q: str, limit=None, cursor: str = None):
+    # Raises ValueError for a malformed limit or cursor
+    limit = _parse_limit(limit)
+    term = _normalize(q)
+    version = db.get_data_version()
+    key = (term, limit, cursor)
+
+    result = search_cache.get(version, key)
+    if result is None:
+        result = _search(term, limit, cursor)
+        search_cache.put(version, key, result, len(json.dumps(result)))
+    return result
+
+
+def _search(term: str, limit: int, cursor: str):
+    with db.connection() as conn:
+        if len(term) >= MIN_TRIGRAM_QUERY and _has_team_search(conn):
+            mode, sql = "fts", FTS_SEARCH_SQL
+            params = {"match": _fts_phrase(term)}
+        else:
+            mode, sql = "like", SEARCH_SQL
+            params = {"pattern": f"%{term}%"}
+
+        after_rank, after_id = _decode_cursor(cursor, mode) if cursor else (FIRST_RANK, FIRST_TEAM_ID)
+        params.update(after_rank=after_rank, after_id=after_id, limit=limit + 1)
+        rows = conn.execute(sql, params).fetchall()
+
+    # One extra row tells whether another page exists
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(mode, rows[-1][1], rows[-1][0])
 
     results = []
     for row in rows:
         results.append({
-            "team_name": row[0],
-            "engine_type": row[1] or "N/A",
-            "hybrids_score": row[2] or 0,
-            "biprops_score": row[3] or 0
+            "team_name": row[2],
+            "engine_type": row[3] or "N/A",
+            "hybrids_score": row[4] or 0,
+            "biprops_score": row[5] or 0,
+            "hybrids_runs": row[6] or 0,
+            "hybrids_best": row[7] or 0,
+            "biprops_runs": row[8] or 0,
+            "biprops_best": row[9] or 0,
         })
-    return {"results": results}
+    return {"results": results, "next_cursor": next_cursor}
+
+
+def search_request(item: dict):
+    q = item.get("query")
+    if q is None:
+        q = ""
+    if not isinstance(q, str):
+        return {"error": "Invalid 'query'"}
+    try:
+        return search_teams(q, item.get("limit"), item.get("cursor"))
+    except ValueError as e:
+        return {"error": str(e)}
+
+@router.post("/")
+async def query_db(item: dict):
+    return FastJSONResponse(await run_db(search_request, item))
+
+def search_params(query: str, limit, cursor):
+    # ETag parameters: the same normalization as the result cache key
+    return ("query", _normalize(query), limit, cursor)
+
+# Cacheable GET equivalent of POST /query
+@router.get("/")
+async def query_db_get(request: Request, query: str = "", limit: Optional[int] = None, cursor: Optional[str] = None):
+    item = {"query": query, "limit": limit, "cursor": cursor}
+    return await conditional_json(request, search_params(query, limit, cursor), run_db, search_request, item)
+
+@router.get("/cache")
+def query_cache_stats():
+    return search_cache.stats()
@@ -1,12 +1,75 @@
-from fastapi import APIRouter
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+from fastapi import APIRouter, Request, Response
 from pydantic import BaseModel
-from ..services.ml_insights import get_team_insights
+from typing import List, Optional, Union
+from .. import db
+from ..conditional import make_etag, last_modified, not_modified, cache_headers, conditional_json
+from ..services.ml_insights import (
+    fetch_team_insights, get_batch_team_insights, get_team_chart, insight_fields, team_exists,
+)
+from ..executors import run_compute
+from ..responses import FastJSONResponse
 
 router = APIRouter()
 
+CHART_CACHE_CONTROL = "public, max-age=60"
+
+# fields: any of metrics, prediction, progress, chart (default: all)
 class TeamQuery(BaseModel):
     team_name: str
+    fields: Optional[Union[str, List[str]]] = None
+    include_chart: Optional[bool] = None
+
+class TeamBatchQuery(BaseModel):
+    team_names: Optional[List[str]] = None
+    fields: Optional[Union[str, List[str]]] = None
 
 @router.post("/")
-def team_insights(query: TeamQuery):
-    return get_team_insights(query.team_name)
+async def team_insights(query: TeamQuery):
+    try:
+        fields = insight_fields(query.fields, query.include_chart)
+    except ValueError as e:
+        return {"error": str(e)}
+    return FastJSONResponse(await fetch_team_insights(query.team_name, fields))
+
+@router.post("/batch")
+async def team_insights_batch(query: TeamBatchQuery):
+    try:
+        fields = insight_fields(query.fields)
+    except ValueError as e:
+        return {"error": str(e)}
+    return FastJSONResponse(await run_compute(get_batch_team_insights, query.team_names, fields))
+
+# Cacheable GET equivalent of POST /team-insights
+@router.get("/{team_name}")
+async def team_insights_get(team_name: str, request: Request, fields: Optional[str] = None,
+                            include_chart: Optional[bool] = None):
+    try:
+        fields = insight_fields(fields, include_chart)
+    except ValueError as e:
+        return {"error": str(e)}
+    params = ("team-insights", team_name, fields)
+    return await conditional_json(request, params, fetch_team_insights, team_name, fields)
+
+@router.get("/{team_name}/chart.png")
+async def team_chart(team_name: str, request: Request):
+    version = db.get_data_version()
+    etag = make_etag(version, ("chart", team_name))
+    modified = last_modified(version)
+    headers = cache_headers(etag, modified, CHART_CACHE_CONTROL)
+    if not_modified(request, etag, modified):
+        # "*" or a current date only match a chart that exists (cached model lookup)
+        if not await run_compute(team_exists, team_name):
+            return Response(status_code=404)
+        return Response(status_code=304, headers=headers)
+
+    try:
+        png = await get_team_chart(team_name)
+    except asyncio.TimeoutError:
+        return Response(status_code=504)
+    except BrokenProcessPool:
+        return Response(status_code=503)
+    if png is None:
+        return Response(status_code=404)
+    return Response(content=png, media_type="image/png", headers=headers)
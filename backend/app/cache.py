@@ -0,0 +1,68 @@
+import threading
+from collections import OrderedDict
+
+# -----------------------
+# Bounded LRU cache
+# -----------------------
+# Thread-safe, bounded both by entry count and by the total size reported
+# for each value, with hit/miss/eviction counters. Keys should include the
+# data version so any DB change makes old entries unreachable; entries from
+# an older version are dropped as soon as a newer one is stored.
+
+
+class LRUCache:
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, version, key):
+        with self._lock:
+            entry = self._entries.get((version, key))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((version, key))
+            self.hits += 1
+            return entry[0]
+
+    def put(self, version, key, value, size: int):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if version != self._version:
+                self._clear()
+                self._version = version
+            old = self._entries.pop((version, key), None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[(version, key)] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def _clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,184 @@
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+from .cache import LRUCache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# -----------------------
+# Response compression
+# -----------------------
+# gzip (or brotli when installed and accepted) for text-like responses above
+# a size threshold. Responses carrying an ETag are fully determined by it, so
+# their compressed bytes are cached under (ETag, encoding) and an identical
+# payload is never compressed twice. Streaming responses are compressed
+# chunk by chunk.
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def _encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str):
+    # Server preference order; q=0 opts out
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    for encoding in _encodings():
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    # Incremental compressor with the same interface for both encodings
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+            self._zlib = None
+        else:
+            self._br = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)  # 31: gzip container
+
+    def compress(self, data: bytes):
+        if self._br is not None:
+            return self._br.process(data) + self._br.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        if self._br is not None:
+            return self._br.finish()
+        return self._zlib.flush()
+
+
+def compress(data: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5):
+    if encoding == "br":
+        return brotli.compress(data, quality=brotli_quality)
+    compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _with_encoding(etag: str, encoding: str):
+    # Each representation needs its own strong ETag; app.conditional strips
+    # the suffix again when matching If-None-Match
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+class CompressionMiddleware:
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 cache_entries: int = 512, cache_bytes: int = 16 * 1024 * 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = LRUCache(cache_entries, cache_bytes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        request_headers = Headers(scope=scope)
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            return await self.app(scope, receive, send)
+        responder = _Responder(self, encoding, send, request_headers.get("if-none-match"))
+        await self.app(scope, receive, responder.send)
+
+    def compress_body(self, body: bytes, encoding: str, etag: str = None):
+        if etag is None:
+            return compress(body, encoding, self.gzip_level, self.brotli_quality)
+        compressed = self.cache.get(None, (etag, encoding))
+        if compressed is None:
+            compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+            self.cache.put(None, (etag, encoding), compressed, len(compressed))
+        return compressed
+
+
+class _Responder:
+    # Holds back http.response.start until the first body chunk shows whether
+    # the response is worth compressing
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send, if_none_match: str = None):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self._if_none_match = if_none_match
+        self._start = None
+        self._compressor = None
+        self._passthrough = False
+
+    def _compressible(self, headers):
+        content_type = headers.get("content-type", "")
+        return (
+            "content-encoding" not in headers
+            and any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+        )
+
+    def _not_modified(self, message):
+        # A 304 must carry the validator the 200 had. That was the encoded
+        # ETag whenever the client's cached copy is the compressed one (small
+        # bodies are never compressed, so their 200 kept the plain ETag)
+        self._passthrough = True
+        headers = MutableHeaders(raw=message["headers"])
+        etag = headers.get("etag")
+        if etag is None or self._if_none_match is None:
+            return
+        encoded = _with_encoding(etag, self.encoding)
+        tags = {tag.strip().removeprefix("W/") for tag in self._if_none_match.split(",")}
+        if encoded in tags:
+            headers["ETag"] = encoded
+            headers.add_vary_header("Accept-Encoding")
+
+    async def send(self, message):
+        if message["type"] == "http.response.start":
+            if message["status"] == 304:
+                self._not_modified(message)
+                return await self._send(message)
+            self._start = message
+            return
+        if message["type"] != "http.response.body" or self._passthrough:
+            return await self._send(message)
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self._compressor is not None:
+            # Streaming: compress each chunk as it arrives
+            chunk = self._compressor.compress(body)
+            if not more_body:
+                chunk += self._compressor.finish()
+            return await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        headers = MutableHeaders(raw=self._start["headers"])
+        if not self._compressible(headers) or (not more_body and len(body) < self.middleware.minimum_size):
+            self._passthrough = True
+            await self._send(self._start)
+            return await self._send(message)
+
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag is not None:
+            headers["ETag"] = _with_encoding(etag, self.encoding)
+
+        if not more_body:
+            body = self.middleware.compress_body(body, self.encoding, etag)
+            headers["Content-Length"] = str(len(body))
+            await self._send(self._start)
+            return await self._send({"type": "http.response.body", "body": body})
+
+        if "content-length" in headers:
+            del headers["content-length"]
+        self._compressor = _Compressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+        await self._send(self._start)
+        await self._send({"type": "http.response.body", "body": self._compressor.compress(body), "more_body": True})
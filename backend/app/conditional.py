@@ -0,0 +1,75 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import Request, Response
+from . import db
+from .responses import FastJSONResponse
+
+# -----------------------
+# Conditional GET
+# -----------------------
+# A response body is fully determined by the data version and the request
+# parameters, so both make a strong ETag. A client revalidating with a
+# matching If-None-Match (or an If-Modified-Since no older than the data)
+# gets 304 before anything is queried or computed.
+JSON_CACHE_CONTROL = "no-cache"  # always revalidate; a 304 is nearly free
+
+
+def make_etag(version, params):
+    digest = hashlib.sha1(repr((version, params)).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def last_modified(version):
+    # The data version is the DB file fingerprint (mtime_ns, size)
+    return formatdate(version[0] / 1e9, usegmt=True)
+
+
+# Suffixes app.compression adds to the ETag of a compressed representation
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def _base_etag(tag: str):
+    tag = tag.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return tag[:-len(suffix) - 1] + '"'
+    return tag
+
+
+def etag_matches(request: Request, etag: str):
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_base_etag(tag) == etag for tag in header.split(","))
+
+
+def not_modified(request: Request, etag: str, modified: str):
+    if "if-none-match" in request.headers:
+        return etag_matches(request, etag)
+    since = request.headers.get("if-modified-since")
+    if since is None:
+        return False
+    try:
+        return parsedate_to_datetime(modified) <= parsedate_to_datetime(since)
+    except (TypeError, ValueError):
+        return False
+
+
+def cache_headers(etag: str, modified: str, cache_control: str = JSON_CACHE_CONTROL):
+    return {"ETag": etag, "Last-Modified": modified, "Cache-Control": cache_control}
+
+
+async def conditional_json(request: Request, params, compute, *args):
+    # compute(*args) is awaited only when the client's copy is out of date
+    version = db.get_data_version()
+    etag = make_etag(version, params)
+    modified = last_modified(version)
+    headers = cache_headers(etag, modified)
+    if not_modified(request, etag, modified):
+        return Response(status_code=304, headers=headers)
+    content = await compute(*args)
+    return FastJSONResponse(content, headers=headers)
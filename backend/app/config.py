@@ -0,0 +1,60 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+# -----------------------
+# Configuration
+# -----------------------
+# Read from the environment (or a .env file in the working directory)
+load_dotenv()
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _flag(name: str, default: bool):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+def _default_db_path():
+    # backend/race-to-space.db in the Docker image, the repo root copy locally
+    candidates = [BACKEND_DIR / "race-to-space.db", BACKEND_DIR.parent / "race-to-space.db"]
+    for candidate in candidates:
+        if candidate.is_file() and candidate.stat().st_size > 0:
+            return str(candidate)
+    return str(candidates[0])
+
+
+# SQLite database
+DB_PATH = os.environ.get("R2S_DB_PATH") or _default_db_path()
+# Serve reads through mode=ro connections with query_only set
+DB_READ_ONLY = _flag("R2S_DB_READ_ONLY", True)
+# immutable=1 skips all locking and change detection: only for a DB baked into the image
+DB_IMMUTABLE = _flag("R2S_DB_IMMUTABLE", False)
+DB_MMAP_SIZE = int(os.environ.get("R2S_DB_MMAP_SIZE", str(256 * 1024 * 1024)))
+DB_CACHE_SIZE_KB = int(os.environ.get("R2S_DB_CACHE_SIZE_KB", "65536"))
+DB_POOL_SIZE = int(os.environ.get("R2S_DB_POOL_SIZE", "4"))
+# Serve reads from an in-memory copy, re-snapshotted when the file changes
+DB_IN_MEMORY = _flag("R2S_DB_IN_MEMORY", True)
+DB_WATCH_INTERVAL = float(os.environ.get("R2S_DB_WATCH_INTERVAL", "2"))
+
+# Thread pools for blocking work called from async endpoints
+DB_WORKERS = int(os.environ.get("R2S_DB_WORKERS", str(DB_POOL_SIZE)))
+COMPUTE_WORKERS = int(os.environ.get("R2S_COMPUTE_WORKERS", "2"))
+
+# /query result cache
+QUERY_CACHE_ENTRIES = int(os.environ.get("R2S_QUERY_CACHE_ENTRIES", "1024"))
+QUERY_CACHE_BYTES = int(os.environ.get("R2S_QUERY_CACHE_BYTES", str(8 * 1024 * 1024)))
+
+# Chart rendering process pool (0 workers renders in a thread instead)
+CHART_WORKERS = int(os.environ.get("R2S_CHART_WORKERS", "2"))
+CHART_TIMEOUT = float(os.environ.get("R2S_CHART_TIMEOUT", "10"))
+
+# Response compression (brotli is used when the package is installed)
+COMPRESS_MIN_SIZE = int(os.environ.get("R2S_COMPRESS_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("R2S_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("R2S_BROTLI_QUALITY", "5"))
+COMPRESS_CACHE_ENTRIES = int(os.environ.get("R2S_COMPRESS_CACHE_ENTRIES", "512"))
+COMPRESS_CACHE_BYTES = int(os.environ.get("R2S_COMPRESS_CACHE_BYTES", str(16 * 1024 * 1024)))
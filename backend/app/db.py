@@ -0,0 +1,283 @@
+import itertools
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from . import config
+
+logger = logging.getLogger(__name__)
+
+# -----------------------
+# Database location
+# -----------------------
+DB_PATH = config.DB_PATH
+
+# -----------------------
+# Connection pool
+# -----------------------
+# A bounded set of long-lived connections shared by every endpoint. Pragmas
+# are applied once per connection, and sqlite3's per-connection statement
+# cache means the constant query strings are only prepared once.
+POOL_SIZE = config.DB_POOL_SIZE
+STATEMENT_CACHE_SIZE = 128
+
+
+class PoolClosed(RuntimeError):
+    pass
+
+
+def _pragmas(read_only: bool):
+    pragmas = [
+        f"PRAGMA cache_size = -{config.DB_CACHE_SIZE_KB}",
+        f"PRAGMA mmap_size = {config.DB_MMAP_SIZE}",  # serve reads from mapped pages
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+    return pragmas
+
+
+def _database_uri(db_path: str, read_only: bool, immutable: bool):
+    uri = Path(db_path).resolve().as_uri()
+    if immutable:
+        return f"{uri}?mode=ro&immutable=1"
+    if read_only:
+        return f"{uri}?mode=ro"
+    return f"{uri}?mode=rw"
+
+
+def file_version(db_path: str):
+    # Cheap fingerprint of the DB file: any write changes mtime and/or size
+    st = os.stat(db_path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class ConnectionPool:
+    def __init__(self, db_path: str, size: int = POOL_SIZE,
+                 read_only: bool = config.DB_READ_ONLY, immutable: bool = config.DB_IMMUTABLE):
+        self.db_path = db_path
+        self.size = size
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _uri(self):
+        return _database_uri(self.db_path, self.read_only, self.immutable)
+
+    def _connect(self):
+        conn = sqlite3.connect(
+            self._uri(),
+            uri=True,
+            check_same_thread=False,  # connections move between worker threads
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        for pragma in _pragmas(self.read_only):
+            conn.execute(pragma)
+        return conn
+
+    def data_version(self):
+        return file_version(self.db_path)
+
+    def acquire(self, timeout: float = None):
+        if self._closed:
+            raise PoolClosed("Connection pool is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        # Open lazily up to the pool size, then wait for a connection back
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                try:
+                    return self._connect()
+                except Exception:
+                    self._created -= 1
+                    raise
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = 0.1 if deadline is None else min(0.1, max(deadline - time.monotonic(), 0))
+            try:
+                return self._idle.get(timeout=wait)
+            except queue.Empty:
+                if self._closed:
+                    raise PoolClosed("Connection pool is closed")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        # Checked and put under the lock so close() cannot drain in between
+        # and leave this connection (and a replica snapshot) open forever
+        with self._lock:
+            if not self._closed:
+                self._idle.put(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        # Idle connections close now, checked-out ones when they are released
+        idle = []
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    idle.append(self._idle.get_nowait())
+                except queue.Empty:
+                    break
+        for conn in idle:
+            conn.close()
+
+
+# -----------------------
+# In-memory replica
+# -----------------------
+# The whole database is copied into a named shared-cache :memory: database
+# with the backup API, and every pooled connection reads from that copy. A
+# refresh builds a new replica and swaps pools, so readers never see a
+# half-copied snapshot. The data version is the file fingerprint taken
+# before the copy, so caches keyed on it always match the served data.
+_replica_ids = itertools.count(1)
+
+
+class MemoryReplicaPool(ConnectionPool):
+    def __init__(self, db_path: str, size: int = POOL_SIZE):
+        super().__init__(db_path, size, read_only=True, immutable=False)
+        self.name = f"r2s-replica-{os.getpid()}-{next(_replica_ids)}"
+        self._version = file_version(db_path)
+
+        # Keeps the memory database alive for as long as the pool exists
+        self._holder = sqlite3.connect(self._uri(), uri=True, check_same_thread=False)
+        source = sqlite3.connect(
+            _database_uri(db_path, read_only=True, immutable=config.DB_IMMUTABLE), uri=True
+        )
+        try:
+            source.backup(self._holder)
+        finally:
+            source.close()
+
+    def _uri(self):
+        return f"file:{self.name}?mode=memory&cache=shared"
+
+    def data_version(self):
+        return self._version
+
+    def close(self):
+        super().close()
+        self._holder.close()
+
+
+def _new_pool(db_path: str, size: int):
+    if config.DB_IN_MEMORY:
+        return MemoryReplicaPool(db_path, size)
+    return ConnectionPool(db_path, size)
+
+
+_pool = {"pool": None}
+_pool_lock = threading.Lock()
+
+
+def _swap_pool(pool):
+    with _pool_lock:
+        old, _pool["pool"] = _pool["pool"], pool
+    if old is not None:
+        old.close()
+
+
+def open_pool(db_path: str = None, size: int = POOL_SIZE):
+    pool = _new_pool(db_path or DB_PATH, size)
+    _swap_pool(pool)
+    return pool
+
+
+def close_pool():
+    _swap_pool(None)
+
+
+def get_pool():
+    # Opened by the app lifespan; scripts get one on first use
+    with _pool_lock:
+        if _pool["pool"] is None:
+            _pool["pool"] = _new_pool(DB_PATH, POOL_SIZE)
+        return _pool["pool"]
+
+
+@contextmanager
+def connection(timeout: float = None):
+    # Retries on a pool that was swapped out between lookup and acquire
+    while True:
+        pool = get_pool()
+        try:
+            conn = pool.acquire(timeout)
+            break
+        except PoolClosed:
+            continue
+    try:
+        yield conn
+    finally:
+        pool.release(conn)
+
+
+def get_data_version():
+    return get_pool().data_version()
+
+
+# -----------------------
+# Replica refresh
+# -----------------------
+_watcher = {"thread": None, "stop": None}
+
+
+def refresh_replica():
+    # Re-snapshot the file into a new replica if it changed; returns True on swap
+    pool = get_pool()
+    if not isinstance(pool, MemoryReplicaPool):
+        return False
+    if file_version(pool.db_path) == pool.data_version():
+        return False
+    _swap_pool(MemoryReplicaPool(pool.db_path, pool.size))
+    return True
+
+
+def _watch(stop: threading.Event, interval: float):
+    while not stop.wait(interval):
+        try:
+            if refresh_replica():
+                logger.info("Reloaded in-memory database replica")
+        except Exception:
+            logger.exception("Failed to refresh in-memory database replica")
+
+
+def start_watcher(interval: float):
+    stop_watcher()
+    if not config.DB_IN_MEMORY or config.DB_IMMUTABLE or interval <= 0:
+        return
+    stop = threading.Event()
+    thread = threading.Thread(target=_watch, args=(stop, interval), name="db-replica-watcher", daemon=True)
+    _watcher.update(thread=thread, stop=stop)
+    thread.start()
+
+
+def stop_watcher():
+    if _watcher["stop"] is not None:
+        _watcher["stop"].set()
+        _watcher["thread"].join()
+    _watcher.update(thread=None, stop=None)
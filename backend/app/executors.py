@@ -0,0 +1,38 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# -----------------------
+# Blocking-work executors
+# -----------------------
+# async endpoints must never run sqlite3 or the pandas/numpy pipeline on the
+# event loop. DB calls and insights computations get separate bounded thread
+# pools, so a burst of slow insights requests cannot starve /query.
+_executors = {"db": None, "compute": None}
+
+
+def start_executors(db_workers: int, compute_workers: int):
+    stop_executors()
+    _executors["db"] = ThreadPoolExecutor(max_workers=db_workers, thread_name_prefix="db")
+    _executors["compute"] = ThreadPoolExecutor(max_workers=compute_workers, thread_name_prefix="compute")
+
+
+def stop_executors():
+    for kind, executor in _executors.items():
+        _executors[kind] = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(kind: str, fn, *args, **kwargs):
+    # Falls back to the loop's default executor when the app lifespan has not run
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executors[kind], functools.partial(fn, *args, **kwargs))
+
+
+async def run_db(fn, *args, **kwargs):
+    return await _run("db", fn, *args, **kwargs)
+
+
+async def run_compute(fn, *args, **kwargs):
+    return await _run("compute", fn, *args, **kwargs)
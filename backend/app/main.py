@@ -1,26 +1,47 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.query import router as query_router
-from app.api.team_insights import router as team_insights_router
-from app.services.ml_insights import get_team_insights  # <- import the function
-import sqlite3
-from typing import Dict
-import os
+from pydantic import ValidationError
+from app.api.query import router as query_router, search_request, search_params
+from app.api.team_insights import router as team_insights_router, TeamQuery
+from app.api.export import router as export_router
+from app.services.ml_insights import fetch_team_insights, insight_fields, warm_up  # <- import the function
+from app.services.charts import start_renderer, stop_renderer
+from app import db, config
+from app.executors import start_executors, stop_executors, run_db
+from app.conditional import conditional_json
+from app.responses import FastJSONResponse
+from app.compression import CompressionMiddleware
+from contextlib import asynccontextmanager
+import threading
+from typing import Dict, Optional
 
 # -----------------------
-# Configuration
+# Lifespan
 # -----------------------
-
-DB_PATH = "/Users/nicolabuttigieg/PycharmProjects/R2S-CompetitionDB/race-to-space.db"
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    db.open_pool()
+    db.start_watcher(config.DB_WATCH_INTERVAL)
+    start_executors(config.DB_WORKERS, config.COMPUTE_WORKERS)
+    # Load pandas/matplotlib and fit the model in the background so the
+    # server starts accepting /query traffic immediately
+    threading.Thread(target=warm_up, name="insights-warm-up", daemon=True).start()
+    start_renderer(config.CHART_WORKERS, config.CHART_TIMEOUT)
+    yield
+    stop_renderer()
+    stop_executors()
+    db.stop_watcher()
+    db.close_pool()
 
 # -----------------------
 # Create FastAPI app
 # -----------------------
-app = FastAPI(title="R2S Competition DB")
+app = FastAPI(title="R2S Competition DB", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Include backend API routers
 app.include_router(query_router, prefix="/query")
 app.include_router(team_insights_router, prefix="/team-insights")
+app.include_router(export_router, prefix="/export")
 
 # Enable CORS for local development
 app.add_middleware(
@@ -30,39 +51,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for larger JSON and NDJSON responses
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=config.COMPRESS_MIN_SIZE,
+    gzip_level=config.GZIP_LEVEL,
+    brotli_quality=config.BROTLI_QUALITY,
+    cache_entries=config.COMPRESS_CACHE_ENTRIES,
+    cache_bytes=config.COMPRESS_CACHE_BYTES,
+)
+
 # -----------------------
 # API Endpoints
 # -----------------------
 
-# /query endpoint (unchanged)
+# /query endpoint
 @app.post("/query")
 async def query_db(item: Dict):
-    query_text = item.get("query", "")
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute("""
-        SELECT t.team_name, e.engine_type,
-               hr.total_score AS hybrids_score,
-               br.total_score AS biprops_score
-        FROM teams t
-        LEFT JOIN hybrids_results hr ON t.team_id = hr.team_id
-        LEFT JOIN biprops_results br ON t.team_id = br.team_id
-        LEFT JOIN engines e ON e.engine_id = hr.engine_id
-        WHERE t.team_name LIKE ?
-    """, (f"%{query_text}%",))
-    rows = cursor.fetchall()
-    conn.close()
+    return FastJSONResponse(await run_db(search_request, item))
 
-    results = [
-        {
-            "team_name": row[0],
-            "engine_type": row[1] or "N/A",
-            "hybrids_score": row[2] or 0,
-            "biprops_score": row[3] or 0
-        }
-        for row in rows
-    ]
-    return {"results": results}
+# Cacheable GET equivalent: GET /query?query=...
+@app.get("/query")
+async def query_db_get(request: Request, query: str = "", limit: Optional[int] = None, cursor: Optional[str] = None):
+    item = {"query": query, "limit": limit, "cursor": cursor}
+    return await conditional_json(request, search_params(query, limit, cursor), run_db, search_request, item)
 
 # -----------------------
 # /team-insights endpoint
@@ -72,10 +84,32 @@ async def team_insights(item: Dict):
     team_name = item.get("team_name")
     if not team_name:
         return {"error": "Missing 'team_name' in request"}
+    # Same parsing (e.g. "false" -> False for include_chart) as POST /team-insights/
+    try:
+        query = TeamQuery.model_validate(item)
+    except ValidationError as e:
+        return {"error": f"Invalid '{e.errors()[0]['loc'][0]}'"}
+    try:
+        fields = insight_fields(query.fields, query.include_chart)
+    except ValueError as e:
+        return {"error": str(e)}
 
-    # Use get_team_insights from ml_insights.py
-    result = get_team_insights(team_name)
-    return result
+    # Use get_team_insights from ml_insights.py, shared between concurrent callers
+    result = await fetch_team_insights(query.team_name, fields)
+    return FastJSONResponse(result)
+
+# Cacheable GET equivalent: GET /team-insights?team_name=...
+@app.get("/team-insights")
+async def team_insights_get(request: Request, team_name: str = "", fields: Optional[str] = None,
+                            include_chart: Optional[bool] = None):
+    if not team_name:
+        return {"error": "Missing 'team_name' in request"}
+    try:
+        fields = insight_fields(fields, include_chart)
+    except ValueError as e:
+        return {"error": str(e)}
+    params = ("team-insights", team_name, fields)
+    return await conditional_json(request, params, fetch_team_insights, team_name, fields)
 
 # -----------------------
 # Run locally
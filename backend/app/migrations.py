@@ -0,0 +1,113 @@
+import sqlite3
+import sys
+from app.services.team_features import create_team_features, check_team_features
+
+# -----------------------
+# Versioned migrations
+# -----------------------
+# Each migration runs once, in its own transaction, and records its version
+# in PRAGMA user_version. The migrations below are idempotent, so databases
+# migrated before versioning existed simply have them re-applied.
+#
+#   python -m app.migrations /path/to/race-to-space.db
+#   python -m app.migrations /path/to/race-to-space.db --check
+
+
+def create_indexes(conn: sqlite3.Connection):
+    # The results team_id indexes serve the /query aggregation and the
+    # team_features triggers. The progress_details and NOCASE team-name
+    # indexes are only for per-team SQL lookups (ad-hoc queries, scripts):
+    # the app reads progress_details whole when fitting the model and matches
+    # team names in memory, while /query uses team_search or LIKE '%q%'.
+    statements = [
+        "CREATE INDEX IF NOT EXISTS idx_hybrids_results_team_id ON hybrids_results(team_id)",
+        "CREATE INDEX IF NOT EXISTS idx_biprops_results_team_id ON biprops_results(team_id)",
+        "CREATE INDEX IF NOT EXISTS idx_progress_details_team_id ON progress_details(team_id)",
+        "CREATE INDEX IF NOT EXISTS idx_teams_team_name_nocase ON teams(team_name COLLATE NOCASE)",
+    ]
+    for statement in statements:
+        conn.execute(statement)
+
+
+def create_team_search(conn: sqlite3.Connection):
+    # FTS5 trigram index over teams.team_name (external content, kept in sync
+    # by triggers) so substring searches like "Imperial" are index lookups
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS team_search USING fts5("
+        "team_name, content='teams', content_rowid='team_id', tokenize='trigram')",
+        "DROP TRIGGER IF EXISTS teams_team_search_ai",
+        "DROP TRIGGER IF EXISTS teams_team_search_ad",
+        "DROP TRIGGER IF EXISTS teams_team_search_au",
+        "CREATE TRIGGER teams_team_search_ai AFTER INSERT ON teams BEGIN "
+        "INSERT INTO team_search(rowid, team_name) VALUES (NEW.team_id, NEW.team_name); END",
+        "CREATE TRIGGER teams_team_search_ad AFTER DELETE ON teams BEGIN "
+        "INSERT INTO team_search(team_search, rowid, team_name) VALUES ('delete', OLD.team_id, OLD.team_name); END",
+        "CREATE TRIGGER teams_team_search_au AFTER UPDATE ON teams BEGIN "
+        "INSERT INTO team_search(team_search, rowid, team_name) VALUES ('delete', OLD.team_id, OLD.team_name); "
+        "INSERT INTO team_search(rowid, team_name) VALUES (NEW.team_id, NEW.team_name); END",
+        "INSERT INTO team_search(team_search) VALUES ('rebuild')",
+    ]
+    for statement in statements:
+        conn.execute(statement)
+
+
+MIGRATIONS = [
+    (1, "team_features", create_team_features),
+    (2, "team_indexes", create_indexes),
+    (3, "team_search", create_team_search),
+]
+
+
+def schema_version(conn: sqlite3.Connection):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(conn: sqlite3.Connection):
+    # Returns the names of the migrations applied
+    applied = []
+    for version, name, apply in MIGRATIONS:
+        if version <= schema_version(conn):
+            continue
+        conn.execute("BEGIN")
+        try:
+            apply(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        applied.append(name)
+    return applied
+
+
+def migrate(db_path: str):
+    # Returns (applied migration names, inconsistent team_features team_ids)
+    conn = sqlite3.connect(db_path, isolation_level=None)  # explicit transactions
+    try:
+        applied = apply_migrations(conn)
+        return applied, check_team_features(conn)
+    finally:
+        conn.close()
+
+
+def check(db_path: str):
+    conn = sqlite3.connect(db_path)
+    try:
+        return check_team_features(conn)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("usage: python -m app.migrations DB_PATH [--check]")
+
+    db_path = sys.argv[1]
+    if "--check" in sys.argv[2:]:
+        mismatched = check(db_path)
+    else:
+        applied, mismatched = migrate(db_path)
+        print(f"applied migrations: {', '.join(applied) or 'none'}")
+    if mismatched:
+        sys.exit(f"team_features inconsistent for team_ids: {mismatched}")
+    print("team_features consistent")
@@ -0,0 +1,49 @@
+import json
+import sys
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+# -----------------------
+# Fast JSON responses
+# -----------------------
+# The app's default response class. Returning one directly from an endpoint
+# also skips FastAPI's jsonable_encoder pass. numpy/pandas values are
+# serialized as they are, so payload builders need no float(...) casts.
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # Values neither encoder handles natively: numpy scalars/arrays for the
+    # stdlib fallback, pandas timestamps and missing values for both
+    pd = sys.modules.get("pandas")  # only loaded if such values can exist
+    if pd is not None and (obj is pd.NA or obj is pd.NaT):
+        return None
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "item"):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
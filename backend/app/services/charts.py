@@ -0,0 +1,163 @@
+import asyncio
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from ..singleflight import SingleFlight
+
+# -----------------------
+# Predicted-score chart
+# -----------------------
+# The all-teams gray bars, tick labels and layout only change with the data,
+# so one base figure is built per data version and each team's chart just
+# overlays its red bar and title. Rendered PNGs are cached per version too.
+MAX_CACHED_CHARTS = 256
+
+# One reusable Figure/canvas per thread (pyplot's global state is not
+# thread-safe), rebuilt in place when the data version changes
+_local = threading.local()
+
+_png_cache = {"version": None, "png": {}}
+_png_lock = threading.Lock()
+
+# Rendering runs in a process pool started with the app so matplotlib never
+# holds the GIL of a request worker; without a pool it falls back to threads.
+_renderer = {"pool": None, "workers": 0, "timeout": None}
+_renderer_lock = threading.Lock()
+
+# Concurrent requests for the same uncached chart wait on a single render
+_render_flight = SingleFlight()
+
+
+def _load_matplotlib():
+    # Object-oriented API only: no pyplot figure manager or global state
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    return Figure, FigureCanvasAgg
+
+
+def _build_base(fig, chart_data):
+    fig.clear()
+    ax = fig.add_subplot()
+    ax.bar(chart_data["team_ids"], chart_data["scores"], color='gray')
+    ax.set_xticks(chart_data["team_ids"])
+    ax.set_xticklabels(chart_data["labels"], rotation=90)
+    ax.set_ylabel("Predicted Total Score")
+    ax.set_title("Team vs All Teams")
+    fig.tight_layout()
+    return ax
+
+
+def _render(fig, ax, chart_data, team_id: int, team_name: str):
+    score = chart_data["scores"][chart_data["team_ids"].index(team_id)]
+
+    highlight = ax.bar([team_id], [score], color='red')
+    ax.set_title(f"Team {team_name} vs All Teams")
+    try:
+        buf = io.BytesIO()
+        fig.canvas.print_png(buf)
+        return buf.getvalue()
+    finally:
+        highlight.remove()
+
+
+def render_chart(version, chart_data, team_id: int, team_name: str):
+    # Entry point inside a renderer process (or thread when no pool is running)
+    if getattr(_local, "fig", None) is None:
+        Figure, FigureCanvasAgg = _load_matplotlib()
+        _local.fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(_local.fig)
+        _local.version = None
+    if _local.version != version:
+        _local.ax = _build_base(_local.fig, chart_data)
+        _local.version = version
+    return _render(_local.fig, _local.ax, chart_data, team_id, team_name)
+
+
+# -----------------------
+# Renderer pool
+# -----------------------
+def start_renderer(workers: int, timeout: float = None):
+    stop_renderer()
+    if workers > 0:
+        # spawn: forking a process that already runs threads is unsafe
+        _renderer["pool"] = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_load_matplotlib,
+        )
+    _renderer["workers"] = workers
+    _renderer["timeout"] = timeout
+
+
+def stop_renderer(kill: bool = False):
+    pool = _renderer["pool"]
+    _renderer["pool"] = None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+        if kill:
+            # shutdown() never stops a render already running in a worker
+            for process in list((getattr(pool, "_processes", None) or {}).values()):
+                process.kill()
+
+
+def _restart_renderer(broken_pool):
+    # Replaces a pool whose worker died or hung; concurrent failures on the
+    # same pool only restart it once
+    with _renderer_lock:
+        if _renderer["pool"] is broken_pool:
+            stop_renderer(kill=True)
+            start_renderer(_renderer["workers"], _renderer["timeout"])
+
+
+def _cached_png(version, key):
+    with _png_lock:
+        if _png_cache["version"] != version:
+            return None
+        return _png_cache["png"].get(key)
+
+
+def _store_png(version, key, png):
+    with _png_lock:
+        if _png_cache["version"] != version:
+            _png_cache["version"] = version
+            _png_cache["png"] = {}
+        if len(_png_cache["png"]) >= MAX_CACHED_CHARTS:
+            _png_cache["png"].clear()
+        _png_cache["png"][key] = png
+
+
+async def _render_in_pool(version, chart_data, team_id: int, team_name: str):
+    pool = _renderer["pool"]
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(pool, render_chart, version, chart_data, team_id, team_name)
+        return await asyncio.wait_for(future, _renderer["timeout"])
+    except (BrokenProcessPool, asyncio.TimeoutError):
+        # A dead worker breaks the whole pool, and a timed-out render keeps
+        # its worker busy; either way start a fresh pool for later requests
+        if pool is not None:
+            _restart_renderer(pool)
+        raise
+
+
+async def _render_and_store(version, chart_data, team_id: int, team_name: str):
+    try:
+        png = await _render_in_pool(version, chart_data, team_id, team_name)
+    except BrokenProcessPool:
+        # Retry once on the replacement pool
+        png = await _render_in_pool(version, chart_data, team_id, team_name)
+    _store_png(version, (team_id, team_name), png)
+    return png
+
+
+async def get_team_chart(version, chart_data, team_id: int, team_name: str):
+    # Raises asyncio.TimeoutError when a render exceeds the configured timeout
+    key = (team_id, team_name)
+    png = _cached_png(version, key)
+    if png is None:
+        png = await _render_flight.do(
+            (version, key), _render_and_store, version, chart_data, team_id, team_name
+        )
+    return png
@@ -1,144 +1,246 @@
-import sqlite3
-import pandas as pd
-import matplotlib
-matplotlib.use("Agg")  # Non-GUI backend
-import matplotlib.pyplot as plt
-import io
-import base64
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
+import threading
+import logging
+from urllib.parse import quote
+from . import charts
+from .. import db
+from ..executors import run_compute
+from ..singleflight import SingleFlight
+from .team_features import FEATURES, TEAM_FEATURES_SQL, MATERIALIZED_SQL, has_team_features
 
 # -----------------------
-# Absolute DB path
+# Model cache
 # -----------------------
-DB_PATH = "/Users/nicolabuttigieg/PycharmProjects/R2S-CompetitionDB/race-to-space.db"
+# The fitted predictions only change when the database does, so they are
+# kept process-wide and refitted when the DB fingerprint moves.
+_model_cache = {"version": None, "model": None}
+_model_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
 
 # -----------------------
-# Main function
+# Lazy heavy imports
 # -----------------------
-def get_team_insights(team_name: str):
-    # Connect to DB
-    conn = sqlite3.connect(DB_PATH)
+# pandas/numpy/matplotlib are only needed by the insights path, so they are
+# imported on first use (or by warm_up) instead of when app.main loads.
+def _pandas():
+    import pandas as pd
+    return pd
+
 
+def warm_up():
+    # Called from a background thread once the server is accepting traffic
     try:
-        # Load all relevant tables
-        df_hybrids = pd.read_sql_query("SELECT * FROM hybrids_results", conn)
-        df_biprops = pd.read_sql_query("SELECT * FROM biprops_results", conn)
-        df_teams = pd.read_sql_query("SELECT * FROM teams", conn)
-        df_progress = pd.read_sql_query("SELECT * FROM progress_details", conn)
-    finally:
-        conn.close()
+        get_model()
+    except Exception:
+        logger.exception("Insights warm-up failed")
+
+
+# -----------------------
+# Feature loading
+# -----------------------
+def load_team_features(conn):
+    # One row per team with only the summed/averaged columns the model uses,
+    # read from the materialized table when the DB has been migrated
+    pd = _pandas()
+    if has_team_features(conn):
+        return pd.read_sql_query(MATERIALIZED_SQL, conn)
+    return pd.read_sql_query(TEAM_FEATURES_SQL, conn)
+
+
+def _fit_model():
+    pd = _pandas()
+    from .regression import StandardizedLinearRegression
+
+    with db.connection() as conn:
+        df_combined = load_team_features(conn)
+        df_teams = pd.read_sql_query("SELECT team_id, team_name FROM teams", conn)
+        df_progress = pd.read_sql_query(
+            "SELECT team_id, team_notes, mentor, sponsor FROM progress_details", conn
+        )
 
     # Ensure team_id is numeric
-    for df in [df_teams, df_progress, df_hybrids, df_biprops]:
+    for df in [df_teams, df_progress]:
         df['team_id'] = df['team_id'].astype(int)
 
-    # Aggregate scores
-    df_hybrids_grouped = df_hybrids.groupby('team_id').agg({
-        'total_score': 'sum',
-        'innov_complexity': 'mean',
-        'innov_implementation': 'mean',
-        'innov_performance': 'mean',
-        'testing_score': 'mean',
-        'documentation_score': 'mean',
-        'presentation_score': 'mean'
-    }).reset_index()
-
-    df_biprops_grouped = df_biprops.groupby('team_id').agg({
-        'total_score': 'sum',
-        'innov_complexity': 'mean',
-        'innov_implementation': 'mean',
-        'innov_performance': 'mean',
-        'testing_score': 'mean',
-        'documentation_score': 'mean',
-        'presentation_score': 'mean'
-    }).reset_index()
-
-    # Merge scores
-    df_combined = pd.merge(
-        df_hybrids_grouped,
-        df_biprops_grouped,
-        on='team_id',
-        how='outer',
-        suffixes=('_hyb', '_bi')
-    )
-    df_combined.fillna(0, inplace=True)
     df_combined['total_score'] = df_combined['total_score_hyb'] + df_combined['total_score_bi']
 
     # Prepare features and target
-    features = [
-        'innov_complexity_hyb', 'innov_implementation_hyb', 'innov_performance_hyb',
-        'testing_score_hyb', 'documentation_score_hyb', 'presentation_score_hyb',
-        'innov_complexity_bi', 'innov_implementation_bi', 'innov_performance_bi',
-        'testing_score_bi', 'documentation_score_bi', 'presentation_score_bi'
-    ]
+    features = FEATURES
     X = df_combined[features]
     y = df_combined['total_score']
 
-    # Standardize features
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    # Standardize features and train simple regression
+    model = StandardizedLinearRegression()
+    df_combined['predicted_score'] = model.fit_predict(X, y)
+
+    # Join team names and progress details once so per-request lookups are a simple filter
+    df_named = pd.merge(df_combined, df_teams, on='team_id')
+    df_named['team_key'] = df_named['team_name'].str.lower()
+    df_details = df_progress.drop_duplicates('team_id')[['team_id', 'team_notes', 'mentor', 'sponsor']]
+    df_named = pd.merge(df_named, df_details, on='team_id', how='left')
+    df_named[['team_notes', 'mentor', 'sponsor']] = df_named[['team_notes', 'mentor', 'sponsor']].fillna("")
+
+    # Plain lists for the chart renderer
+    chart_data = {
+        "team_ids": [int(team_id) for team_id in df_combined['team_id']],
+        "scores": [float(score) for score in df_combined['predicted_score']],
+        "labels": list(df_combined['team_id'].map(df_teams.set_index('team_id')['team_name'])),
+    }
 
-    # Train simple regression
-    model = LinearRegression()
-    model.fit(X_scaled, y)
-    df_combined['predicted_score'] = model.predict(X_scaled)
+    return {
+        "combined": df_combined,
+        "named": df_named,
+        "chart": chart_data,
+    }
+
+
+def invalidate_model():
+    # Forces a refit on the next request, e.g. after restoring a DB snapshot
+    with _model_lock:
+        _model_cache["model"] = None
+        _model_cache["version"] = None
 
-    # Find the requested team
-    team_row = pd.merge(df_combined, df_teams, on='team_id')
-    team_row = team_row[team_row['team_name'].str.lower() == team_name.lower()]
 
+def get_model():
+    version = db.get_data_version()
+    with _model_lock:
+        if _model_cache["version"] != version or _model_cache["model"] is None:
+            _model_cache["model"] = dict(_fit_model(), version=version)
+            _model_cache["version"] = version
+        return _model_cache["model"]
+
+
+def _find_team(model, team_name: str):
+    df_named = model["named"]
+    team_row = df_named[df_named['team_key'] == team_name.lower()]
     if team_row.empty:
-        return {"error": "Team not found"}
+        return None
+    return team_row.iloc[0]
 
-    team_row = team_row.iloc[0]
-    team_id = int(team_row['team_id'])
 
-    hybrids_score = float(team_row.get("total_score_hyb", 0))
-    biprops_score = float(team_row.get("total_score_bi", 0))
-    ai_ml_score = round((hybrids_score + biprops_score) / 2, 2)
-    engine_type = team_row.get("engine_type", "N/A")
-    team_pred_score = float(team_row['predicted_score'])
-
-    # Pull progress details
-    progress_row = df_progress[df_progress['team_id'] == team_id]
-    if not progress_row.empty:
-        progress_row = progress_row.iloc[0]
-        team_notes = progress_row.get("team_notes", "") or "None listed"
-        mentor = progress_row.get("mentor", "") or "None listed"
-        sponsor = progress_row.get("sponsor", "") or "None listed"
+# -----------------------
+# Response fields
+# -----------------------
+# team_name and engine_type are always returned; the rest can be selected
+# with fields=... so a client drawing its own chart never needs chart_url
+INSIGHT_FIELDS = ("metrics", "prediction", "progress", "chart")
+
+
+def insight_fields(fields=None, include_chart=None):
+    # fields: None (all), a comma-separated string or a list. Raises ValueError
+    if fields is None:
+        selected = set(INSIGHT_FIELDS)
     else:
-        team_notes = mentor = sponsor = "None listed"
-
-    # Generate chart
-    plt.figure(figsize=(10, 6))
-    plt.bar(df_combined['team_id'], df_combined['predicted_score'], color='gray')
-    plt.bar([team_id], [team_pred_score], color='red')
-    team_names = df_teams.set_index('team_id').loc[df_combined['team_id'].astype(int)]['team_name']
-    plt.xticks(df_combined['team_id'], team_names, rotation=90)
-    plt.ylabel("Predicted Total Score")
-    plt.title(f"Team {team_name} vs All Teams")
-    plt.tight_layout()
-
-    # Convert chart to base64
-    buf = io.BytesIO()
-    plt.savefig(buf, format='png')
-    plt.close()
-    buf.seek(0)
-    chart_base64 = base64.b64encode(buf.read()).decode('utf-8')
-
-    # Return structured data
-    return {
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        if not isinstance(fields, (list, tuple)) or not all(isinstance(f, str) for f in fields):
+            raise ValueError("Invalid 'fields'")
+        selected = {f.strip() for f in fields if f.strip()}
+        if not selected <= set(INSIGHT_FIELDS):
+            raise ValueError("Invalid 'fields'")
+    if include_chart is not None:
+        if include_chart:
+            selected.add("chart")
+        else:
+            selected.discard("chart")
+    return tuple(f for f in INSIGHT_FIELDS if f in selected)
+
+
+def team_exists(team_name: str):
+    return _find_team(get_model(), team_name) is not None
+
+
+def chart_url(team_name: str):
+    return f"/team-insights/{quote(team_name, safe='')}/chart.png"
+
+
+def _team_payload(team_row, team_name: str, fields=INSIGHT_FIELDS):
+    engine_type = team_row.get("engine_type", "N/A")
+    payload = {
         "team_name": team_name,
         "engine_type": engine_type or "N/A",
-        "insights": [
+    }
+
+    if "metrics" in fields:
+        # numpy scalars are left as-is; app.responses serializes them natively
+        hybrids_score = team_row.get("total_score_hyb", 0)
+        biprops_score = team_row.get("total_score_bi", 0)
+        ai_ml_score = round((hybrids_score + biprops_score) / 2, 2)
+        payload["insights"] = [
             {"metric": "Hybrids Score", "value": hybrids_score},
             {"metric": "Biprops Score", "value": biprops_score},
             {"metric": "AI/ML Score", "value": ai_ml_score},
-        ],
-        "notes": team_notes,
-        "mentor": mentor,
-        "sponsor": sponsor,
-        "predicted_score": team_pred_score,
-        "chart": chart_base64,
-    }
+        ]
+    if "progress" in fields:
+        payload["notes"] = team_row.get("team_notes", "") or "None listed"
+        payload["mentor"] = team_row.get("mentor", "") or "None listed"
+        payload["sponsor"] = team_row.get("sponsor", "") or "None listed"
+    if "prediction" in fields:
+        payload["predicted_score"] = team_row['predicted_score']
+    if "chart" in fields:
+        # The chart is served separately as a cacheable PNG; without "chart"
+        # matplotlib is never loaded
+        payload["chart_url"] = chart_url(team_name)
+    return payload
+
+
+# -----------------------
+# Main function
+# -----------------------
+def get_team_insights(team_name: str, fields=INSIGHT_FIELDS):
+    model = get_model()
+
+    # Find the requested team
+    team_row = _find_team(model, team_name)
+    if team_row is None:
+        return {"error": "Team not found"}
+
+    return _team_payload(team_row, team_name, fields)
+
+
+# Concurrent requests for the same team and data version share one computation
+_insights_flight = SingleFlight()
+
+
+async def fetch_team_insights(team_name: str, fields=INSIGHT_FIELDS):
+    key = (team_name, fields, db.get_data_version())
+    return await _insights_flight.do(key, run_compute, get_team_insights, team_name, fields)
+
+
+async def get_team_chart(team_name: str):
+    # Returns the PNG bytes, or None when the team does not exist
+    model = await run_compute(get_model)
+    team_row = _find_team(model, team_name)
+    if team_row is None:
+        return None
+
+    team_id = int(team_row['team_id'])
+    # Rendered in the chart process pool; base figure and PNG cached per data version
+    return await charts.get_team_chart(model["version"], model["chart"], team_id, team_name)
+
+
+# -----------------------
+# Batch function
+# -----------------------
+def get_batch_team_insights(team_names=None, fields=INSIGHT_FIELDS):
+    # All teams are served from the single cached feature matrix/prediction pass
+    df_named = get_model()["named"]
+
+    if team_names is None:
+        rows = df_named.sort_values('team_id')
+        return {
+            "results": [_team_payload(row, row["team_name"], fields) for row in rows.to_dict("records")],
+            "missing": [],
+        }
+
+    by_key = {row["team_key"]: row for row in df_named.to_dict("records")}
+    results = []
+    missing = []
+    for name in team_names:
+        row = by_key.get(name.lower())
+        if row is None:
+            missing.append(name)
+        else:
+            results.append(_team_payload(row, name, fields))
+    return {"results": results, "missing": missing}
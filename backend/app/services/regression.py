@@ -0,0 +1,41 @@
+import numpy as np
+
+# -----------------------
+# Standardized least squares
+# -----------------------
+# Drop-in for StandardScaler + LinearRegression: features are scaled to zero
+# mean / unit variance (population std, constant columns left unscaled) and
+# the coefficients come from a closed-form lstsq on the centred data.
+
+
+class StandardizedLinearRegression:
+    def __init__(self):
+        self.mean_ = None
+        self.scale_ = None
+        self.coef_ = None
+        self.intercept_ = None
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=float) - self.mean_) / self.scale_
+
+    def fit(self, X, y):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+
+        self.mean_ = X.mean(axis=0)
+        scale = X.std(axis=0)
+        scale[scale == 0] = 1.0
+        self.scale_ = scale
+
+        # Scaled features are already centred, so only y needs centring
+        X_scaled = self.transform(X)
+        y_mean = y.mean()
+        self.coef_, *_ = np.linalg.lstsq(X_scaled, y - y_mean, rcond=None)
+        self.intercept_ = y_mean
+        return self
+
+    def predict(self, X):
+        return self.transform(X) @ self.coef_ + self.intercept_
+
+    def fit_predict(self, X, y):
+        return self.fit(X, y).predict(X)
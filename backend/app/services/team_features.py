@@ -0,0 +1,127 @@
+import sqlite3
+
+# -----------------------
+# Feature definitions
+# -----------------------
+# Per-run component scores averaged per team; total_score is summed
+SCORE_COLUMNS = [
+    'innov_complexity', 'innov_implementation', 'innov_performance',
+    'testing_score', 'documentation_score', 'presentation_score'
+]
+RESULT_TABLES = {'hyb': 'hybrids_results', 'bi': 'biprops_results'}
+
+FEATURES = [f"{col}_{suffix}" for suffix in RESULT_TABLES for col in SCORE_COLUMNS]
+TEAM_FEATURE_COLUMNS = [f"total_score_{suffix}" for suffix in RESULT_TABLES] + FEATURES
+
+
+# -----------------------
+# Aggregation SQL
+# -----------------------
+# Derived tables rather than CTEs so the same statement can run inside triggers
+def team_features_sql(team_id_expr=None):
+    where = f" WHERE team_id = {team_id_expr}" if team_id_expr else ""
+
+    ids = " UNION ".join(f"SELECT team_id FROM {table}{where}" for table in RESULT_TABLES.values())
+    joins = []
+    selects = {}
+    for suffix, table in RESULT_TABLES.items():
+        aggs = ", ".join(f"AVG({col}) AS {col}" for col in SCORE_COLUMNS)
+        joins.append(
+            f"LEFT JOIN (SELECT team_id, SUM(total_score) AS total_score, {aggs} "
+            f"FROM {table}{where} GROUP BY team_id) AS {suffix} USING (team_id)"
+        )
+        selects[f"total_score_{suffix}"] = f"COALESCE({suffix}.total_score, 0)"
+        for col in SCORE_COLUMNS:
+            selects[f"{col}_{suffix}"] = f"COALESCE({suffix}.{col}, 0)"
+
+    columns = ", ".join(f"{selects[name]} AS {name}" for name in TEAM_FEATURE_COLUMNS)
+    return (
+        f"SELECT CAST(ids.team_id AS INTEGER) AS team_id, {columns} "
+        f"FROM ({ids}) AS ids {' '.join(joins)} "
+        f"ORDER BY ids.team_id"
+    )
+
+
+TEAM_FEATURES_SQL = team_features_sql()
+MATERIALIZED_SQL = f"SELECT team_id, {', '.join(TEAM_FEATURE_COLUMNS)} FROM team_features ORDER BY team_id"
+
+
+def has_team_features(conn):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'team_features'"
+    ).fetchone()
+    return row is not None
+
+
+# -----------------------
+# Materialized table + triggers
+# -----------------------
+def _refresh_sql(team_id_expr):
+    columns = ", ".join(["team_id"] + TEAM_FEATURE_COLUMNS)
+    return (
+        f"DELETE FROM team_features WHERE team_id = {team_id_expr}; "
+        f"INSERT INTO team_features ({columns}) {team_features_sql(team_id_expr)};"
+    )
+
+
+def create_team_features(conn: sqlite3.Connection):
+    columns = ", ".join(f"{name} REAL NOT NULL DEFAULT 0" for name in TEAM_FEATURE_COLUMNS)
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS team_features (team_id INTEGER PRIMARY KEY, {columns})"
+    ]
+
+    # Each trigger re-aggregates only the team(s) touched by the row change
+    for table in RESULT_TABLES.values():
+        statements += [
+            f"DROP TRIGGER IF EXISTS {table}_team_features_ai",
+            f"DROP TRIGGER IF EXISTS {table}_team_features_ad",
+            f"DROP TRIGGER IF EXISTS {table}_team_features_au",
+            f"CREATE TRIGGER {table}_team_features_ai AFTER INSERT ON {table} BEGIN "
+            f"{_refresh_sql('NEW.team_id')} END",
+            f"CREATE TRIGGER {table}_team_features_ad AFTER DELETE ON {table} BEGIN "
+            f"{_refresh_sql('OLD.team_id')} END",
+            f"CREATE TRIGGER {table}_team_features_au AFTER UPDATE ON {table} BEGIN "
+            f"{_refresh_sql('OLD.team_id')} {_refresh_sql('NEW.team_id')} END",
+        ]
+
+    # Backfill from the raw results
+    statements += [
+        "DELETE FROM team_features",
+        f"INSERT INTO team_features (team_id, {', '.join(TEAM_FEATURE_COLUMNS)}) {TEAM_FEATURES_SQL}",
+    ]
+
+    # Runs inside the caller's transaction (see app.migrations)
+    for statement in statements:
+        conn.execute(statement)
+
+
+# -----------------------
+# Consistency check
+# -----------------------
+def check_team_features(conn: sqlite3.Connection, tolerance: float = 1e-9):
+    # Compare the materialized table with the original pandas aggregation.
+    # Returns the team_ids whose rows differ (empty list when consistent).
+    import numpy as np
+    import pandas as pd
+
+    df_hybrids = pd.read_sql_query("SELECT * FROM hybrids_results", conn)
+    df_biprops = pd.read_sql_query("SELECT * FROM biprops_results", conn)
+    agg = {'total_score': 'sum', **{col: 'mean' for col in SCORE_COLUMNS}}
+    expected = pd.merge(
+        df_hybrids.groupby('team_id').agg(agg).reset_index(),
+        df_biprops.groupby('team_id').agg(agg).reset_index(),
+        on='team_id',
+        how='outer',
+        suffixes=('_hyb', '_bi')
+    ).fillna(0)
+    expected['team_id'] = expected['team_id'].astype(int)
+
+    actual = pd.read_sql_query(MATERIALIZED_SQL, conn)
+    merged = pd.merge(expected, actual, on='team_id', how='outer', suffixes=('', '_mat'), indicator=True)
+
+    mismatched = set(merged.loc[merged['_merge'] != 'both', 'team_id'])
+    both = merged[merged['_merge'] == 'both']
+    for name in TEAM_FEATURE_COLUMNS:
+        close = np.isclose(both[name], both[f"{name}_mat"], rtol=0, atol=tolerance)
+        mismatched.update(both.loc[~close, 'team_id'])
+    return sorted(int(team_id) for team_id in mismatched)
@@ -0,0 +1,51 @@
+import asyncio
+
+# -----------------------
+# Single-flight
+# -----------------------
+# Concurrent callers asking for the same key await one shared computation
+# instead of each starting their own. The shared task survives a waiter being
+# cancelled and is only cancelled when every waiter has gone. An exception
+# reaches every waiter, and the key is freed as soon as the task finishes so
+# the next call (e.g. after an error) starts fresh.
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight = {}  # key -> [task, waiter count]
+        self.calls = 0
+        self.runs = 0
+
+    async def do(self, key, fn, *args):
+        # fn(*args) must return an awaitable
+        self.calls += 1
+        entry = self._inflight.get(key)
+        if entry is None:
+            self.runs += 1
+            task = asyncio.ensure_future(fn(*args))
+            entry = self._inflight[key] = [task, 0]
+            task.add_done_callback(lambda done: self._finished(key, done))
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not task.done():
+                task.cancel()
+                # Free the key now: the done callback only runs on a later
+                # loop iteration, and a caller arriving in between must not
+                # join a task it did not cancel
+                if self._inflight.get(key) is entry:
+                    del self._inflight[key]
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _finished(self, key, task):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is task:
+            del self._inflight[key]
+        # Mark the exception retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
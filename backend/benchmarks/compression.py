@@ -0,0 +1,66 @@
+import sys
+import time
+
+from app import compression, config
+from app.api.export import iter_runs_ndjson
+from app.api.query import search_teams
+from app.responses import dumps
+from app.services.ml_insights import get_team_insights, get_batch_team_insights
+
+# -----------------------
+# Compression benchmark
+# -----------------------
+# Compression ratio and CPU time per response for the JSON/NDJSON payloads,
+# at a few gzip levels (and brotli qualities when brotli is installed), plus
+# the cost of a cached hit in CompressionMiddleware. Run from the backend
+# folder:
+#
+#   python -m benchmarks.compression [iterations]
+
+
+def payloads():
+    return {
+        "/query (all teams)": dumps(search_teams("", limit=500)),
+        "/team-insights": dumps(get_team_insights("Cranfield")),
+        "/team-insights/batch": dumps(get_batch_team_insights()),
+        "/export/runs.ndjson": b"".join(iter_runs_ndjson()),
+    }
+
+
+def settings():
+    yield "gzip -1", "gzip", {"gzip_level": 1}
+    yield "gzip -6", "gzip", {"gzip_level": 6}
+    yield "gzip -9", "gzip", {"gzip_level": 9}
+    if compression.brotli is not None:
+        yield "br q4", "br", {"brotli_quality": 4}
+        yield "br q5", "br", {"brotli_quality": 5}
+        yield "br q11", "br", {"brotli_quality": 11}
+
+
+def cpu_time(fn, iterations: int):
+    start = time.process_time()
+    for _ in range(iterations):
+        result = fn()
+    return (time.process_time() - start) / iterations, result
+
+
+def main(iterations: int):
+    middleware = compression.CompressionMiddleware(None)
+    for name, body in payloads().items():
+        skipped = " (below threshold, sent uncompressed)" if len(body) < config.COMPRESS_MIN_SIZE else ""
+        print(f"{name}: {len(body)} bytes{skipped}")
+        for label, encoding, options in settings():
+            seconds, compressed = cpu_time(
+                lambda: compression.compress(body, encoding, **options), iterations
+            )
+            print(f"  {label:8s} {len(compressed):7d} bytes   ratio {len(body) / len(compressed):5.2f}   "
+                  f"{seconds * 1e6:8.1f} us CPU")
+
+        encoding = compression._encodings()[0]
+        middleware.compress_body(body, encoding, '"bench"')
+        seconds, _ = cpu_time(lambda: middleware.compress_body(body, encoding, '"bench"'), iterations)
+        print(f"  cached {encoding:4s}                                {seconds * 1e6:8.1f} us CPU")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,50 @@
+import sqlite3
+import sys
+import time
+
+from app import db
+from app.api.query import SEARCH_SQL, FIRST_RANK, FIRST_TEAM_ID
+
+PARAMS = {"pattern": "%a%", "after_rank": FIRST_RANK, "after_id": FIRST_TEAM_ID, "limit": 50}
+
+# -----------------------
+# Connection overhead benchmark
+# -----------------------
+# Compares the old per-request sqlite3.connect/close against the shared
+# connection pool for the /query statement. Run from the backend folder:
+#
+#   python -m benchmarks.connection_overhead DB_PATH [iterations]
+
+
+def per_request(db_path: str, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        conn = sqlite3.connect(db_path)
+        conn.execute(SEARCH_SQL, PARAMS).fetchall()
+        conn.close()
+    return (time.perf_counter() - start) / iterations
+
+
+def pooled(db_path: str, iterations: int):
+    pool = db.ConnectionPool(db_path, size=1)
+    with pool.connection() as conn:
+        conn.execute(SEARCH_SQL, PARAMS).fetchall()  # open + prepare once
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with pool.connection() as conn:
+            conn.execute(SEARCH_SQL, PARAMS).fetchall()
+    elapsed = (time.perf_counter() - start) / iterations
+    pool.close()
+    return elapsed
+
+
+if __name__ == "__main__":
+    db_path = sys.argv[1] if len(sys.argv) > 1 else db.DB_PATH
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    fresh = per_request(db_path, iterations)
+    reused = pooled(db_path, iterations)
+    print(f"per-request connect: {fresh * 1e6:8.1f} us/query")
+    print(f"pooled connection:   {reused * 1e6:8.1f} us/query")
+    print(f"overhead removed:    {(fresh - reused) * 1e6:8.1f} us/query ({fresh / reused:.1f}x)")
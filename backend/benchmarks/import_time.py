@@ -0,0 +1,43 @@
+import re
+import subprocess
+import sys
+
+# -----------------------
+# Import-time benchmark
+# -----------------------
+# Measures the cold import cost of app.main with `python -X importtime` and
+# reports how much of it is spent in the heavy analytics packages. Run from
+# the backend folder:
+#
+#   python -m benchmarks.import_time [module]
+
+HEAVY_MODULES = ["pandas", "numpy", "matplotlib", "sklearn"]
+LINE = re.compile(r"import time:\s+\d+\s+\|\s+(\d+)\s+\|\s*(\S+)")
+
+
+def measure(module: str = "app.main"):
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # cumulative microseconds per imported module (any nesting depth)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            cumulative.setdefault(match.group(2), int(match.group(1)))
+    return cumulative
+
+
+if __name__ == "__main__":
+    module = sys.argv[1] if len(sys.argv) > 1 else "app.main"
+    cumulative = measure(module)
+
+    print(f"import {module}: {cumulative[module] / 1000:.1f} ms")
+    for name in HEAVY_MODULES:
+        if name in cumulative:
+            print(f"  {name:<12} {cumulative[name] / 1000:8.1f} ms")
+        else:
+            print(f"  {name:<12} {'not loaded':>11}")
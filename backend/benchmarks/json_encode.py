@@ -0,0 +1,68 @@
+import sys
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import responses
+from app.api.query import search_teams
+from app.services.ml_insights import get_team_insights, get_batch_team_insights
+
+# -----------------------
+# JSON encoding benchmark
+# -----------------------
+# Encode time and body size for /query and /team-insights payloads: the old
+# jsonable_encoder + stdlib JSONResponse path against app.responses, with
+# orjson and with its stdlib fallback. Run from the backend folder:
+#
+#   python -m benchmarks.json_encode [iterations]
+
+
+def starlette_json(payload):
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def fast_json(payload):
+    return responses.dumps(payload)
+
+
+def stdlib_fallback(payload):
+    orjson, responses.orjson = responses.orjson, None
+    try:
+        return responses.dumps(payload)
+    finally:
+        responses.orjson = orjson
+
+
+def payloads():
+    return {
+        "/query (all teams)": search_teams("", limit=500),
+        "/team-insights": get_team_insights("Cranfield"),
+        "/team-insights/batch": get_batch_team_insights(),
+    }
+
+
+def time_encoder(encode, payload, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        body = encode(payload)
+    return (time.perf_counter() - start) / iterations, len(body)
+
+
+def main(iterations: int):
+    encoders = [("jsonable_encoder + json", starlette_json)]
+    if responses.orjson is not None:
+        encoders.append(("FastJSONResponse (orjson)", fast_json))
+    encoders.append(("FastJSONResponse (stdlib)", stdlib_fallback))
+
+    for name, payload in payloads().items():
+        print(name)
+        baseline = None
+        for label, encode in encoders:
+            seconds, size = time_encoder(encode, payload, iterations)
+            baseline = baseline or seconds
+            print(f"  {label:27s} {seconds * 1e6:9.1f} us   {size:7d} bytes   x{baseline / seconds:5.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
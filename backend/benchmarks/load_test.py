@@ -0,0 +1,72 @@
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from app.main import app
+from app.services import ml_insights
+
+# -----------------------
+# /query latency under /team-insights load
+# -----------------------
+# Measures /query latency on its own, then again while several clients
+# hammer /team-insights with a forced model refit on every call. With the
+# blocking work off the event loop the two distributions should match.
+# Requires httpx. Run from the backend folder:
+#
+#   python -m benchmarks.load_test [insights_clients] [query_requests]
+
+
+async def _query_latencies(client, requests: int):
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.post("/query", json={"query": "Imperial"})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def _insights_client(client, stop: asyncio.Event, calls: list):
+    while not stop.is_set():
+        ml_insights.invalidate_model()  # make every call pay for a full refit
+        response = await client.post("/team-insights", json={"team_name": "UCL"})
+        response.raise_for_status()
+        calls.append(1)
+
+
+def _summary(latencies):
+    ms = sorted(latency * 1000 for latency in latencies)
+    p95 = ms[int(len(ms) * 0.95) - 1]
+    return f"p50 {statistics.median(ms):7.2f} ms   p95 {p95:7.2f} ms   max {ms[-1]:7.2f} ms"
+
+
+async def main(insights_clients: int, query_requests: int):
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await client.post("/team-insights", json={"team_name": "UCL"})  # warm imports
+            idle = await _query_latencies(client, query_requests)
+
+            stop = asyncio.Event()
+            calls = []
+            workers = [
+                asyncio.create_task(_insights_client(client, stop, calls))
+                for _ in range(insights_clients)
+            ]
+            await asyncio.sleep(0.2)
+            loaded = await _query_latencies(client, query_requests)
+            stop.set()
+            await asyncio.gather(*workers)
+
+    print(f"/query idle:                              {_summary(idle)}")
+    print(f"/query with {insights_clients} /team-insights clients:      {_summary(loaded)}")
+    print(f"/team-insights refits completed during run: {len(calls)}")
+
+
+if __name__ == "__main__":
+    insights_clients = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    query_requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(main(insights_clients, query_requests))
@@ -0,0 +1,23 @@
+import shutil
+
+import pytest
+
+from app import config, db
+
+
+@pytest.fixture
+def db_copy(tmp_path):
+    # A scratch copy of the bundled database, safe to write to
+    path = tmp_path / "race-to-space.db"
+    shutil.copyfile(config.DB_PATH, path)
+    return str(path)
+
+
+@pytest.fixture
+def open_pool():
+    # Opens the app's pool on a given database; the default pool is restored after
+    def _open(db_path=None, size=db.POOL_SIZE):
+        return db.open_pool(db_path, size)
+
+    yield _open
+    db.close_pool()
@@ -0,0 +1,66 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import charts
+from app.services.ml_insights import get_model
+
+pytest.importorskip("matplotlib")
+
+
+def test_threaded_renders_match_serial():
+    model = get_model()
+    chart = model["chart"]
+    teams = list(zip(chart["team_ids"], chart["labels"]))
+
+    serial = {team: charts.render_chart(model["version"], chart, *team) for team in teams}
+
+    # Every team several times over, interleaved across threads
+    jobs = teams * 4
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        threaded = list(pool.map(lambda team: charts.render_chart(model["version"], chart, *team), jobs))
+
+    assert len(set(serial.values())) == len(teams)
+    for team, png in zip(jobs, threaded):
+        assert png == serial[team], team
+
+
+@pytest.fixture
+def renderer():
+    charts.start_renderer(1, timeout=60)
+    charts._png_cache.update(version=None, png={})
+    yield
+    charts.stop_renderer(kill=True)
+    charts._png_cache.update(version=None, png={})
+
+
+def _chart(model, index):
+    chart = model["chart"]
+    return charts.get_team_chart(model["version"], chart, chart["team_ids"][index], chart["labels"][index])
+
+
+def test_renderer_recovers_from_dead_worker(renderer):
+    model = get_model()
+    asyncio.run(_chart(model, 0))
+
+    pool = charts._renderer["pool"]
+    for process in pool._processes.values():
+        process.kill()
+
+    png = asyncio.run(_chart(model, 1))
+    assert png.startswith(b"\x89PNG")
+    assert charts._renderer["pool"] is not pool
+
+
+def test_renderer_restarts_after_timeout(renderer):
+    model = get_model()
+    pool = charts._renderer["pool"]
+    charts._renderer["timeout"] = 0.001
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(_chart(model, 0))
+    assert charts._renderer["pool"] is not pool
+
+    charts._renderer["timeout"] = 60
+    assert asyncio.run(_chart(model, 0)).startswith(b"\x89PNG")
@@ -0,0 +1,39 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+LARGE = {"query": "", "limit": 500}  # well above the compression threshold
+SMALL = {"query": "Cranfield"}
+
+
+def test_gzip_response_and_its_304_share_the_encoded_etag():
+    response = client.get("/query", params=LARGE, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    etag = response.headers["etag"]
+    assert etag.endswith('-gzip"')
+
+    revalidated = client.get("/query", params=LARGE, headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    assert "Accept-Encoding" in revalidated.headers["vary"]
+
+
+@pytest.mark.parametrize("params", [LARGE, SMALL])
+def test_uncompressed_response_and_its_304_share_the_plain_etag(params):
+    for accept in ("identity", "gzip"):
+        response = client.get("/query", params=params, headers={"Accept-Encoding": accept})
+        if "content-encoding" in response.headers:
+            continue  # covered above
+        etag = response.headers["etag"]
+        revalidated = client.get("/query", params=params, headers={"Accept-Encoding": accept, "If-None-Match": etag})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == etag
+
+
+def test_compressed_body_round_trips():
+    plain = client.get("/query", params=LARGE, headers={"Accept-Encoding": "identity"})
+    compressed = client.get("/query", params=LARGE, headers={"Accept-Encoding": "gzip"})
+    assert compressed.json() == plain.json()
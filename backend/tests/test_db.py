@@ -0,0 +1,51 @@
+import queue
+import sqlite3
+import threading
+
+import pytest
+
+from app import db
+
+
+class _SwapDuringPut(queue.LifoQueue):
+    # Starts pool.close() just as a released connection is being put back,
+    # the window a replica swap can hit
+    def __init__(self, maxsize):
+        super().__init__(maxsize)
+        self.pool = None
+        self.armed = False
+
+    def put(self, item, block=True, timeout=None):
+        if self.armed:
+            self.armed = False
+            closer = threading.Thread(target=self.pool.close)
+            closer.start()
+            closer.join(0.2)  # with the lock held this has to wait for us
+            self.closer = closer
+        super().put(item, block, timeout)
+
+
+@pytest.mark.parametrize("pool_class", [db.ConnectionPool, db.MemoryReplicaPool])
+def test_release_racing_close_does_not_leak(db_copy, pool_class):
+    pool = pool_class(db_copy, size=1)
+    idle = _SwapDuringPut(maxsize=1)
+    idle.pool = pool
+    pool._idle = idle
+
+    conn = pool.acquire()
+    idle.armed = True
+    pool.release(conn)
+    idle.closer.join()
+
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
+    assert idle.empty()
+
+
+def test_release_after_close_closes_connection(db_copy):
+    pool = db.ConnectionPool(db_copy, size=1)
+    conn = pool.acquire()
+    pool.close()
+    pool.release(conn)
+    with pytest.raises(sqlite3.ProgrammingError):
+        conn.execute("SELECT 1")
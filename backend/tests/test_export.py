@@ -0,0 +1,30 @@
+import json
+
+from app.api import export
+
+
+def _lines(chunks):
+    return [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+
+
+def test_export_does_not_hold_a_connection_between_batches(open_pool, monkeypatch):
+    monkeypatch.setattr(export, "BATCH_SIZE", 3)
+    pool = open_pool(size=1)
+
+    stream = export.iter_runs_ndjson()
+    first = next(stream)  # a paused download
+
+    conn = pool.acquire(timeout=1)
+    pool.release(conn)
+
+    rows = _lines([first, *stream])
+    with pool.connection() as conn:
+        expected = sum(
+            conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("hybrids_results", "biprops_results")
+        )
+    assert len(rows) == expected
+    assert [row["category"] for row in rows] == sorted((row["category"] for row in rows), key=["hybrids", "biprops"].index)
+    for category in ("hybrids", "biprops"):
+        ids = [row["result_id"] for row in rows if row["category"] == category]
+        assert ids == sorted(set(ids))
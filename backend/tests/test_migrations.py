@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from app.api.query import SEARCH_SQL, FTS_SEARCH_SQL, FIRST_RANK, FIRST_TEAM_ID
+from app.migrations import MIGRATIONS, migrate, schema_version
+
+INDEXES = [
+    "idx_hybrids_results_team_id",
+    "idx_biprops_results_team_id",
+    "idx_progress_details_team_id",
+    "idx_teams_team_name_nocase",
+]
+PAGE_PARAMS = {"after_rank": FIRST_RANK, "after_id": FIRST_TEAM_ID, "limit": 51}
+
+
+@pytest.fixture
+def migrated_db(db_copy):
+    # Strip the bundled database back to version 0, then migrate it from scratch
+    conn = sqlite3.connect(db_copy)
+    for index in INDEXES:
+        conn.execute(f"DROP INDEX IF EXISTS {index}")
+    conn.execute("DROP TABLE IF EXISTS team_search")
+    conn.execute("PRAGMA user_version = 0")
+    conn.commit()
+    conn.close()
+
+    applied, mismatched = migrate(db_copy)
+    assert applied == [name for _, name, _ in MIGRATIONS]
+    assert mismatched == []
+
+    conn = sqlite3.connect(db_copy)
+    yield conn
+    conn.close()
+
+
+def _plan(conn, sql, params=()):
+    return " | ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def test_schema_version(migrated_db):
+    assert schema_version(migrated_db) == MIGRATIONS[-1][0]
+
+
+@pytest.mark.parametrize("sql, params", [
+    (SEARCH_SQL, {"pattern": "%a%", **PAGE_PARAMS}),
+    (FTS_SEARCH_SQL, {"match": '"Imperial"', **PAGE_PARAMS}),
+])
+def test_results_sql_uses_team_id_indexes(migrated_db, sql, params):
+    plan = _plan(migrated_db, sql, params)
+    assert "idx_hybrids_results_team_id" in plan
+    assert "idx_biprops_results_team_id" in plan
+
+
+def test_progress_lookup_uses_team_id_index(migrated_db):
+    plan = _plan(migrated_db, "SELECT team_notes, mentor, sponsor FROM progress_details WHERE team_id = ?", (1,))
+    assert "idx_progress_details_team_id" in plan
+
+
+def test_team_name_lookup_uses_nocase_index(migrated_db):
+    # Only ad-hoc/per-team SQL lookups; the app matches names in memory
+    plan = _plan(migrated_db, "SELECT team_id FROM teams WHERE team_name = ? COLLATE NOCASE", ("ucl",))
+    assert "idx_teams_team_name_nocase" in plan
@@ -0,0 +1,93 @@
+import base64
+import sqlite3
+
+import pytest
+
+from app.api import query
+
+HYBRID_SCORES = [10.0, 30.5, 20.0]
+BIPROP_SCORES = [7.25, 4.0]
+
+
+@pytest.fixture
+def multirun_db(db_copy, open_pool):
+    # One new team with 3 hybrid and 2 biprop runs: a plain join would give 6 rows
+    conn = sqlite3.connect(db_copy)
+    with conn:
+        team_id = conn.execute("INSERT INTO teams (team_name) VALUES ('Multirun Rocketry')").lastrowid
+        conn.executemany(
+            "INSERT INTO hybrids_results (engine_id, team_id, total_score) VALUES (1, ?, ?)",
+            [(team_id, score) for score in HYBRID_SCORES],
+        )
+        conn.executemany(
+            "INSERT INTO biprops_results (engine_id, team_id, total_score) VALUES (9, ?, ?)",
+            [(team_id, score) for score in BIPROP_SCORES],
+        )
+    conn.close()
+    open_pool(db_copy)
+    query.search_cache.clear()
+    yield
+    query.search_cache.clear()
+
+
+@pytest.mark.parametrize("q", ["Multirun", "multirun rock", "Mu"])  # FTS and LIKE paths
+def test_multirun_team_is_one_row(multirun_db, q):
+    rows = [row for row in query.search_teams(q, limit=500)["results"] if row["team_name"] == "Multirun Rocketry"]
+
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["engine_type"] == "Hybrids"
+    assert row["hybrids_runs"] == len(HYBRID_SCORES)
+    assert row["biprops_runs"] == len(BIPROP_SCORES)
+    assert row["hybrids_score"] == pytest.approx(sum(HYBRID_SCORES))
+    assert row["biprops_score"] == pytest.approx(sum(BIPROP_SCORES))
+    assert row["hybrids_best"] == max(HYBRID_SCORES)
+    assert row["biprops_best"] == max(BIPROP_SCORES)
+
+
+def test_every_team_appears_once(multirun_db):
+    names = [row["team_name"] for row in query.search_teams("", limit=500)["results"]]
+    assert len(names) == len(set(names))
+
+
+@pytest.mark.parametrize("item", [{}, {"query": None}, {"query": ""}])
+def test_missing_query_lists_teams(item):
+    assert query.search_request(item) == query.search_teams("")
+
+
+@pytest.mark.parametrize("value", [123, 1.5, True, ["UCL"], {"q": "UCL"}])
+def test_non_string_query_is_rejected(value):
+    assert query.search_request({"query": value}) == {"error": "Invalid 'query'"}
+
+
+def _cursor(payload):
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize("payload", [
+    '["like", 0, 1e999]',              # int(inf) overflows
+    '["like", 0, 9223372036854775808]',  # above SQLite INTEGER
+    '["like", 0, -9223372036854775809]',
+    '["like", NaN, 1]',
+    '["like", Infinity, 1]',
+    '["fts", 0, 1]',                   # wrong mode for a short query
+    '["like", 0]',
+])
+def test_crafted_cursor_is_rejected(payload):
+    assert query.search_request({"query": "a", "cursor": _cursor(payload)}) == {"error": "Invalid 'cursor'"}
+
+
+@pytest.mark.parametrize("limit", [float("inf"), float("nan"), "1e999", 0, -1, "x", [1]])
+def test_crafted_limit_is_rejected(limit):
+    assert query.search_request({"query": "a", "limit": limit}) == {"error": "Invalid 'limit'"}
+
+
+def test_crafted_cursor_over_http_is_not_a_500():
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+    cursor = _cursor('["like", 0, 1e999]')
+    assert client.get("/query", params={"query": "a", "cursor": cursor}).json() == {"error": "Invalid 'cursor'"}
+    response = client.post("/query", content='{"query": "a", "limit": 1e999}', headers={"Content-Type": "application/json"})
+    assert response.json() == {"error": "Invalid 'limit'"}
@@ -0,0 +1,37 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from app import config
+from app.services.ml_insights import load_team_features
+from app.services.regression import StandardizedLinearRegression
+from app.services.team_features import FEATURES
+
+
+@pytest.fixture
+def team_data():
+    conn = sqlite3.connect(config.DB_PATH)
+    try:
+        df = load_team_features(conn)
+    finally:
+        conn.close()
+    return df[FEATURES], df["total_score_hyb"] + df["total_score_bi"]
+
+
+def test_matches_sklearn_on_bundled_db(team_data):
+    preprocessing = pytest.importorskip("sklearn.preprocessing")
+    linear_model = pytest.importorskip("sklearn.linear_model")
+    X, y = team_data
+
+    scaler = preprocessing.StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    expected = linear_model.LinearRegression().fit(X_scaled, y)
+
+    model = StandardizedLinearRegression().fit(X, y)
+
+    np.testing.assert_allclose(model.mean_, scaler.mean_, atol=1e-12)
+    np.testing.assert_allclose(model.scale_, scaler.scale_, atol=1e-12)
+    np.testing.assert_allclose(model.coef_, expected.coef_, atol=1e-9)
+    np.testing.assert_allclose(model.intercept_, expected.intercept_, atol=1e-9)
+    np.testing.assert_allclose(model.predict(X), expected.predict(X_scaled), atol=1e-9)
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_callers_share_one_computation():
+    async def main():
+        flight = SingleFlight()
+        started = []
+
+        async def work(value):
+            started.append(value)
+            await asyncio.sleep(0.01)
+            return value * 2
+
+        results = await asyncio.gather(*[flight.do("key", work, 21) for _ in range(20)])
+        return flight, started, results
+
+    flight, started, results = run(main())
+    assert results == [42] * 20
+    assert started == [21]
+    assert flight.runs == 1
+    assert flight.calls == 20
+    assert flight._inflight == {}
+
+
+def test_error_reaches_every_waiter_and_frees_key():
+    async def main():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise KeyError("boom")
+
+        results = await asyncio.gather(*[flight.do("key", fail) for _ in range(5)], return_exceptions=True)
+
+        async def ok():
+            return "ok"
+
+        retry = await flight.do("key", ok)
+        return flight, results, retry
+
+    flight, results, retry = run(main())
+    assert all(isinstance(result, KeyError) for result in results)
+    assert retry == "ok"
+    assert flight.runs == 2
+
+
+def test_cancelled_waiter_leaves_others_running():
+    async def main():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", work))
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return flight, await second
+
+    flight, result = run(main())
+    assert result == "done"
+    assert flight.runs == 1
+
+
+def test_caller_after_last_waiter_cancelled_starts_fresh():
+    async def main():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            return "done"
+
+        first = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        shared = flight._inflight["key"][0]
+        first.cancel()
+        await asyncio.sleep(0)  # first handles the cancellation; done callback not yet run
+
+        # Joins on the very next tick, before the cancelled task has finished
+        second = await flight.do("key", work)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return flight, shared, second
+
+    flight, shared, second = run(main())
+    assert shared.cancelled()
+    assert second == "done"
+    assert flight.runs == 2
@@ -0,0 +1,55 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+@pytest.mark.parametrize("path", ["/team-insights", "/team-insights/"])
+@pytest.mark.parametrize("include_chart, expected", [
+    (False, False), ("false", False), ("0", False),
+    (True, True), ("true", True), (None, True),
+])
+def test_include_chart_is_parsed_the_same_by_both_endpoints(path, include_chart, expected):
+    body = {"team_name": "Cranfield"}
+    if include_chart is not None:
+        body["include_chart"] = include_chart
+    data = client.post(path, json=body).json()
+
+    assert data["team_name"] == "Cranfield"
+    assert ("chart_url" in data) is expected
+
+
+@pytest.mark.parametrize("path", ["/team-insights", "/team-insights/"])
+def test_fields_select_payload_groups(path):
+    data = client.post(path, json={"team_name": "Cranfield", "fields": ["prediction"]}).json()
+    assert set(data) == {"team_name", "engine_type", "predicted_score"}
+
+
+def test_invalid_include_chart_is_an_error():
+    data = client.post("/team-insights", json={"team_name": "Cranfield", "include_chart": "maybe"}).json()
+    assert data == {"error": "Invalid 'include_chart'"}
+
+
+@pytest.mark.parametrize("fields, expected", [
+    (None, True), (["chart"], True), (["metrics", "prediction"], False),
+])
+def test_batch_follows_the_same_field_contract(fields, expected):
+    body = {"team_names": ["Cranfield", "UCL"]}
+    if fields is not None:
+        body["fields"] = fields
+    results = client.post("/team-insights/batch", json=body).json()["results"]
+    single = client.post("/team-insights/", json={"team_name": "Cranfield", **({"fields": fields} if fields else {})}).json()
+
+    assert results
+    assert all(("chart_url" in row) is expected for row in results)
+    assert results[0] == single
+
+
+@pytest.mark.parametrize("team, expected", [("Nope", 404), ("Cranfield", 304)])
+def test_chart_revalidation_only_matches_existing_teams(team, expected):
+    current = client.get("/query", params={"query": "Cranfield"}).headers["last-modified"]
+    for headers in ({"If-None-Match": "*"}, {"If-Modified-Since": current}):
+        response = client.get(f"/team-insights/{team}/chart.png", headers=headers)
+        assert response.status_code == expected
@@ -5,11 +5,9 @@ export async function POST(request: Request) {
     const { query } = await request.json();
 
     // Call your FastAPI backend
-    const res = await fetch('http://127.0.0.1:8000/query', {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ query }),
-    });
+    const res = await fetch(
+      `http://127.0.0.1:8000/query?query=${encodeURIComponent(query ?? '')}`
+    );
 
     const data = await res.json();
 
@@ -9,6 +9,7 @@ import {
   Tooltip,
   Legend,
   ResponsiveContainer,
+  Cell,
 } from "recharts";
 
 interface TeamInsightsProps {
@@ -25,7 +26,11 @@ interface TeamData {
   notes: string;
   mentor: string;
   sponsor: string;
-  chart: string | null;
+}
+
+interface TeamPrediction {
+  team_name: string;
+  predicted_score: number;
 }
 
 const DEFAULT_INSIGHTS: Insight[] = [
@@ -40,11 +45,23 @@ export default function TeamInsights({ teamName }: TeamInsightsProps) {
     notes: "None listed",
     mentor: "None listed",
     sponsor: "None listed",
-    chart: null,
   });
+  const [predictions, setPredictions] = useState<TeamPrediction[]>([]);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState("");
 
+  // Predicted scores for every team, drawn here instead of the server-side PNG
+  useEffect(() => {
+    fetch("http://127.0.0.1:8000/team-insights/batch", {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ fields: ["prediction"] }),
+    })
+      .then((res) => res.json())
+      .then((data) => setPredictions(Array.isArray(data.results) ? data.results : []))
+      .catch(() => setPredictions([]));
+  }, []);
+
   useEffect(() => {
     if (!teamName) return;
 
@@ -53,11 +70,11 @@ export default function TeamInsights({ teamName }: TeamInsightsProps) {
       setError("");
 
       try {
-        const res = await fetch("http://127.0.0.1:8000/team-insights", {
-          method: "POST",
-          headers: { "Content-Type": "application/json" },
-          body: JSON.stringify({ team_name: teamName }),
-        });
+        // GET so the browser can revalidate with the ETag and get a 304;
+        // no chart_url since the charts are drawn client-side
+        const res = await fetch(
+          `http://127.0.0.1:8000/team-insights/${encodeURIComponent(teamName)}?include_chart=false`
+        );
 
         if (!res.ok) {
           const text = await res.text();
@@ -78,7 +95,6 @@ export default function TeamInsights({ teamName }: TeamInsightsProps) {
           notes: data.notes || "None listed",
           mentor: data.mentor || "None listed",
           sponsor: data.sponsor || "None listed",
-          chart: data.chart || null,
         });
       } catch (err: any) {
         setError(err.message || "Failed to fetch team insights");
@@ -209,21 +225,39 @@ export default function TeamInsights({ teamName }: TeamInsightsProps) {
 
       {/* ================= TEAM-SPECIFIC CHART EXPLANATION ================= */}
 
-      {/* BASE64 CHART */}
-      {teamData.chart && (
+      {/* PREDICTED SCORE CHART (all teams, selected team in red) */}
+      {predictions.length > 0 && (
         <div
           style={{
             marginTop: "2rem",
+            height: 400,
             maxWidth: "800px",
             marginLeft: "auto",
             marginRight: "auto",
           }}
         >
-          <img
-            src={`data:image/png;base64,${teamData.chart}`}
-            alt={`${teamName} chart`}
-            style={{ width: "100%" }}
-          />
+          <ResponsiveContainer width="100%" height="100%">
+            <BarChart data={predictions}>
+              <XAxis
+                dataKey="team_name"
+                tick={{ fill: "#fff" }}
+                angle={-90}
+                textAnchor="end"
+                height={120}
+                interval={0}
+              />
+              <YAxis tick={{ fill: "#fff" }} />
+              <Tooltip contentStyle={{ backgroundColor: "#333", color: "#fff" }} />
+              <Bar dataKey="predicted_score" name="Predicted Total Score">
+                {predictions.map((p) => (
+                  <Cell
+                    key={p.team_name}
+                    fill={p.team_name.toLowerCase() === teamName.toLowerCase() ? "red" : "gray"}
+                  />
+                ))}
+              </Bar>
+            </BarChart>
+          </ResponsiveContainer>
         </div>
       )}
     </div>